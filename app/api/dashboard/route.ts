@@ -2,6 +2,39 @@ import { NextResponse } from "next/server"
 import fs from "fs"
 import path from "path"
 
+// Instantané écrit par scripts/jellyfin_kometa.py à la fin de chaque exécution
+function loadStatsSnapshot() {
+  const dataDir = process.env.KOMETA_DATA_DIR || path.join(process.cwd(), "data")
+  const snapshotPath = path.join(dataDir, "library_stats.json")
+  try {
+    if (fs.existsSync(snapshotPath)) {
+      const snapshot = JSON.parse(fs.readFileSync(snapshotPath, "utf8"))
+      if (snapshot && snapshot.version === 1) {
+        return snapshot
+      }
+    }
+  } catch (error) {
+    console.error("Erreur lors de la lecture de l'instantané des statistiques:", error)
+  }
+  return null
+}
+
+// Compte les éléments via TotalRecordCount sans télécharger la liste (Limit=0)
+async function fetchItemCount(jellyfinUrl, apiKey, params) {
+  const query = new URLSearchParams({ ...params, Recursive: "true", Limit: "0" })
+  const response = await fetch(`${jellyfinUrl}/Items?${query}`, {
+    headers: {
+      "X-Emby-Token": apiKey,
+      "Content-Type": "application/json",
+    },
+  })
+  if (!response.ok) {
+    throw new Error(`Impossible de compter les éléments (${response.status})`)
+  }
+  const data = await response.json()
+  return data.TotalRecordCount || 0
+}
+
 async function getJellyfinData() {
   const jellyfinUrl = process.env.JELLYFIN_URL || "http://localhost:8096"
   const apiKey = process.env.JELLYFIN_API_KEY
@@ -43,37 +76,39 @@ async function getJellyfinData() {
     }
 
     const librariesData = await librariesResponse.json()
+    const snapshot = loadStatsSnapshot()
     const libraries = []
 
-    // Pour chaque bibliothèque, récupérer les statistiques
+    // Pour chaque bibliothèque, utiliser l'instantané ou compter via TotalRecordCount
     for (const library of librariesData.Items) {
       try {
-        // Récupérer les éléments de la bibliothèque
-        const itemsResponse = await fetch(`${jellyfinUrl}/Items?ParentId=${library.Id}&Recursive=true`, {
-          headers: {
-            "X-Emby-Token": apiKey,
-            "Content-Type": "application/json",
-          },
-        })
-
-        // Récupérer les collections
-        const collectionsResponse = await fetch(
-          `${jellyfinUrl}/Items?ParentId=${library.Id}&IncludeItemTypes=BoxSet&Recursive=true`,
-          {
-            headers: {
-              "X-Emby-Token": apiKey,
-              "Content-Type": "application/json",
-            },
-          },
-        )
+        const stats = snapshot?.libraries?.[library.Name]
+        if (stats && stats.id === library.Id) {
+          libraries.push({
+            name: library.Name,
+            totalItems: stats.total_items,
+            collections: stats.collection_count,
+            itemsByType: stats.items_by_type,
+            collectionSizes: Object.fromEntries(
+              Object.entries(stats.collections || {}).map(([name, collection]) => [name, collection.size]),
+            ),
+            delta: stats.delta,
+            durationSeconds: stats.duration_seconds,
+            lastUpdate: new Date(stats.updated_at).toLocaleString("fr-FR"),
+            status: "success",
+          })
+          continue
+        }
 
-        const itemsData = itemsResponse.ok ? await itemsResponse.json() : { Items: [] }
-        const collectionsData = collectionsResponse.ok ? await collectionsResponse.json() : { Items: [] }
+        const [totalItems, collections] = await Promise.all([
+          fetchItemCount(jellyfinUrl, apiKey, { ParentId: library.Id }),
+          fetchItemCount(jellyfinUrl, apiKey, { ParentId: library.Id, IncludeItemTypes: "BoxSet" }),
+        ])
 
         libraries.push({
           name: library.Name,
-          totalItems: itemsData.Items?.length || 0,
-          collections: collectionsData.Items?.length || 0,
+          totalItems,
+          collections,
           lastUpdate: new Date().toLocaleString("fr-FR"),
           status: "success",
         })
@@ -89,7 +124,7 @@ async function getJellyfinData() {
       }
     }
 
-    return { libraries }
+    return { libraries, lastRun: snapshot?.last_run || null }
   } catch (error) {
     console.error("Erreur lors de la récupération des données Jellyfin:", error)
     throw error
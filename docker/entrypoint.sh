@@ -38,6 +38,7 @@ settings:
   create_missing_collections: true
   update_posters: true
   dry_run: false
+  fetch_workers: 4
 EOF
     echo "✅ Configuration par défaut créée dans /app/config/jellyfin_config.yaml"
 fi
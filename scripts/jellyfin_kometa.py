@@ -1,10 +1,38 @@
+import time
+_STARTUP_T0 = time.perf_counter()
+
+import argparse
+import gzip
+import hashlib
+import importlib
+import json
 import logging
 import sys
 import os
-import yaml
-import requests
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+# requests et yaml sont importés à la demande (voir _lazy_import) pour accélérer le démarrage
+CONFIG_CACHE_VERSION = 2
+# Récupération parallèle par tranches (StartIndex/Limit) des grandes bibliothèques
+SHARD_DEFAULT_PAGE_SIZE = 1000
+SHARD_MIN_PAGE_SIZE = 200
+SHARD_MAX_PAGE_SIZE = 10000
+SHARD_TARGET_SECONDS = 2.0
+SHARD_RETRIES = 2
+DEFAULT_FETCH_WORKERS = 4
+STATS_SNAPSHOT_VERSION = 1
+DEFAULT_STATS_FILE = Path(os.getenv('KOMETA_DATA_DIR', 'data')) / 'library_stats.json'
+LIBRARY_DUMP_VERSION = 1
+# Champs conservés dans les exports hors-ligne: ceux utilisés par _filter_items, plus Name/Type/Tags/OfficialRating
+# pour les rapports et les jeux de données de test
+DUMP_ITEM_KEYS = ('Id', 'Name', 'Type', 'ProductionYear', 'Genres', 'Studios', 'Tags', 'OfficialRating', 'CommunityRating')
+_startup_timings: Dict[str, float] = {}
 
 # Configuration des logs
 logging.basicConfig(
@@ -17,20 +45,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _lazy_import(module_name: str) -> Any:
+    """Importe un module lourd au premier usage et enregistre la durée de l'import"""
+    module = sys.modules.get(module_name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        _startup_timings[f"import {module_name}"] = time.perf_counter() - start
+    return module
+
 class JellyfinAPI:
-    def __init__(self, server_url: str, api_key: str):
+    def __init__(self, server_url: str, api_key: str, max_workers: int = DEFAULT_FETCH_WORKERS):
         self.server_url = server_url.rstrip('/')
         self.api_key = api_key
         self.headers = {
             'X-Emby-Token': api_key,
             'Content-Type': 'application/json'
         }
+        # Parallélisme fixe; seule la taille des tranches s'ajuste d'après la latence observée du serveur
+        self.max_workers = max(1, max_workers)
+        self.page_size = SHARD_DEFAULT_PAGE_SIZE
+        self._seconds_per_item: Optional[float] = None
+        self._tuning_lock = threading.Lock()
+        # Une session requests par thread pour réutiliser les connexions entre les tranches
+        self._local = threading.local()
         logger.info(f"JellyfinAPI initialisée pour {self.server_url}")
 
     def _request(self, method: str, endpoint: str, params: Optional[Dict] = None, json_data: Optional[Dict] = None) -> Optional[Any]:
         url = f"{self.server_url}{endpoint}"
+        requests = _lazy_import('requests')
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            self._local.session = session
         try:
-            response = requests.request(method, url, headers=self.headers, params=params, json=json_data, timeout=30)
+            response = session.request(method, url, params=params, json=json_data, timeout=30)
             response.raise_for_status()
             if response.status_code == 204:
                 return None
@@ -49,7 +99,8 @@ class JellyfinAPI:
         data = self._request("GET", f"/Users/{user_id}/Views")
         return data.get('Items') if data else None
         
-    def get_items(self, library_id: str, item_type: Optional[str] = None, filters: Optional[Dict] = None, fields: Optional[str] = None) -> List[Dict]:
+    def get_items(self, library_id: str, item_type: Optional[str] = None, filters: Optional[Dict] = None, fields: Optional[str] = None) -> Optional[List[Dict]]:
+        """Récupère les éléments d'une bibliothèque; None si une partie n'a pas pu être récupérée"""
         params = {
             'ParentId': library_id,
             'Recursive': 'true',
@@ -59,9 +110,94 @@ class JellyfinAPI:
             params['IncludeItemTypes'] = item_type
         if filters:
             params.update(filters)
-        
+
+        # Ordre explicite pour limiter les décalages entre tranches StartIndex/Limit; les doublons et
+        # les manques restants (égalités de SortName, éléments ajoutés en cours de route) sont détectés à la fusion
+        params.setdefault('SortBy', 'SortName')
+        params.setdefault('SortOrder', 'Ascending')
+        return self._fetch_shards(params)
+
+    def get_item_count(self, parent_id: str, item_type: Optional[str] = None, filters: Optional[Dict] = None, recursive: bool = True) -> Optional[int]:
+        """Compte les éléments via TotalRecordCount (Limit=0), sans télécharger la liste"""
+        params = {'ParentId': parent_id, 'Recursive': 'true' if recursive else 'false'}
+        if item_type:
+            params['IncludeItemTypes'] = item_type
+        if filters:
+            params.update(filters)
+        params['Limit'] = 0
         data = self._request("GET", "/Items", params=params)
-        return data.get('Items', []) if data else []
+        return data.get('TotalRecordCount') if data else None
+
+    def _fetch_shards(self, params: Dict) -> Optional[List[Dict]]:
+        """Récupère la première page, puis le reste en tranches StartIndex/Limit parallèles fusionnées dans l'ordre"""
+        page_size = self.page_size
+        first_page = self._fetch_shard(params, 0, page_size)
+        if first_page is None:
+            return None
+        first_items, total = first_page
+        if total <= len(first_items):
+            return first_items
+        if len(first_items) != page_size:
+            first_page = self._fetch_shard(params, 0, page_size, exact=True)
+            if first_page is None:
+                logger.error(f"Première tranche incomplète après {SHARD_RETRIES + 1} tentatives. Récupération incomplète, abandon.")
+                return None
+            first_items = first_page[0]
+
+        ranges = [(start, min(page_size, total - start)) for start in range(page_size, total, page_size)]
+        workers = min(self.max_workers, len(ranges))
+        logger.info(f"Récupération de {total} éléments en {len(ranges) + 1} tranches de {page_size} ({workers} en parallèle)")
+
+        if workers == 1:
+            shards = [self._fetch_shard(params, start, limit) for start, limit in ranges]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                shards = list(executor.map(lambda shard: self._fetch_shard(params, *shard), ranges))
+
+        items: List[Dict] = []
+        seen_ids = set()
+        for (start, limit), shard in zip([(0, page_size)] + ranges, [(first_items, total)] + shards):
+            if shard is None:
+                logger.error(f"Tranche {start}-{start + limit - 1} abandonnée après {SHARD_RETRIES + 1} tentatives. Récupération incomplète, abandon.")
+                return None
+            for item in shard[0]:
+                if item.get('Id') not in seen_ids:
+                    seen_ids.add(item.get('Id'))
+                    items.append(item)
+        if len(items) != total:
+            logger.error(f"{len(items)} éléments distincts récupérés sur {total} annoncés (bibliothèque modifiée pendant la récupération ?). Récupération incomplète, abandon.")
+            return None
+        return items
+
+    def _fetch_shard(self, params: Dict, start_index: int, limit: int, exact: Optional[bool] = None) -> Optional[Tuple[List[Dict], int]]:
+        """Récupère une tranche avec nouvelles tentatives; retourne (éléments, TotalRecordCount) ou None"""
+        shard_params = dict(params, StartIndex=start_index, Limit=limit)
+        for attempt in range(SHARD_RETRIES + 1):
+            started = time.perf_counter()
+            data = self._request("GET", "/Items", params=shard_params)
+            if data is not None:
+                shard_items = data.get('Items', [])
+                total = data.get('TotalRecordCount', len(shard_items))
+                # Une tranche courte est un échec si exact, ou par défaut pour toute tranche non finale
+                must_be_full = exact if exact is not None else start_index > 0 and start_index + limit < total
+                if not must_be_full or len(shard_items) == limit:
+                    self._observe_throughput(time.perf_counter() - started, len(shard_items))
+                    return shard_items, total
+                logger.warning(f"Tranche {start_index}-{start_index + limit - 1} incomplète ({len(shard_items)}/{limit} éléments)")
+            if attempt < SHARD_RETRIES:
+                logger.warning(f"Nouvelle tentative pour la tranche {start_index}-{start_index + limit - 1} ({attempt + 1}/{SHARD_RETRIES})")
+                time.sleep(0.5 * (attempt + 1))
+        return None
+
+    def _observe_throughput(self, seconds: float, item_count: int):
+        """Ajuste la taille des tranches pour qu'une requête dure environ SHARD_TARGET_SECONDS"""
+        if item_count < SHARD_MIN_PAGE_SIZE:
+            return  # Trop peu d'éléments pour une mesure significative
+        per_item = seconds / item_count
+        with self._tuning_lock:
+            self._seconds_per_item = per_item if self._seconds_per_item is None else 0.7 * self._seconds_per_item + 0.3 * per_item
+            tuned = int(SHARD_TARGET_SECONDS / self._seconds_per_item)
+            self.page_size = max(SHARD_MIN_PAGE_SIZE, min(SHARD_MAX_PAGE_SIZE, tuned))
 
     def create_collection(self, name: str, item_ids: List[str], library_id: Optional[str] = None) -> Optional[str]:
         parent_id_to_use = library_id
@@ -75,7 +211,7 @@ class JellyfinAPI:
 
     def get_collections(self, library_id: Optional[str] = None) -> List[Dict]:
         if library_id:
-            return self.get_items(library_id, item_type='BoxSet')
+            return self.get_items(library_id, item_type='BoxSet', fields='ChildCount') or []
         else:
             logger.warning("Récupération des collections globales non implémentée en détail, retour des collections de la première bibliothèque.")
             users = self.get_users()
@@ -83,9 +219,12 @@ class JellyfinAPI:
                 user_id = users[0]['Id']
                 libraries = self.get_libraries(user_id)
                 if libraries:
-                    return self.get_items(libraries[0]['Id'], item_type='BoxSet')
+                    return self.get_items(libraries[0]['Id'], item_type='BoxSet') or []
             return []
 
+    def get_collection_size(self, collection_id: str) -> Optional[int]:
+        return self.get_item_count(collection_id, recursive=False)
+
     def add_to_collection(self, collection_id: str, item_ids: List[str]) -> bool:
         response = self._request("POST", f"/Collections/{collection_id}/Items", params={'Ids': ",".join(item_ids)})
         return response is None
@@ -94,11 +233,109 @@ class JellyfinAPI:
         response = self._request("POST", f"/Items/{item_id}", json_data=metadata)
         return response is None
 
+class LibraryStatsSnapshot:
+    """Instantané compact des statistiques de bibliothèques, lu par le tableau de bord"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.data: Dict = self._load()
+        self.previous_libraries: Dict[str, Dict] = dict(self.data.get('libraries', {}))
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            if isinstance(data, dict) and data.get('version') == STATS_SNAPSHOT_VERSION:
+                return data
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Instantané de statistiques illisible ({self.path}), il sera recréé: {e}")
+        return {'version': STATS_SNAPSHOT_VERSION, 'libraries': {}}
+
+    def update_library(self, name: str, library_id: str, items: List[Dict], collections: Dict[str, Dict], duration: float):
+        items_by_type = dict(Counter(item.get('Type', 'Unknown') for item in items))
+        previous = self.previous_libraries.get(name)
+        # Pas de variation sans entrée précédente pour cette même bibliothèque (première exécution, renommage)
+        delta: Optional[Dict] = None
+        if previous and previous.get('id') == library_id:
+            previous_by_type = previous.get('items_by_type', {})
+            delta = {
+                'total_items': len(items) - previous.get('total_items', 0),
+                'collection_count': len(collections) - previous.get('collection_count', 0),
+                'items_by_type': {
+                    item_type: items_by_type.get(item_type, 0) - previous_by_type.get(item_type, 0)
+                    for item_type in set(items_by_type) | set(previous_by_type)
+                    if items_by_type.get(item_type, 0) != previous_by_type.get(item_type, 0)
+                },
+            }
+        self.data['libraries'][name] = {
+            'id': library_id,
+            'total_items': len(items),
+            'items_by_type': items_by_type,
+            'collection_count': len(collections),
+            'collections': collections,
+            'duration_seconds': round(duration, 3),
+            'updated_at': _now_iso(),
+            'delta': delta,
+        }
+        self.save()
+
+    def finish_run(self, started_at: str, duration: float, dry_run: bool):
+        self.data['last_run'] = {
+            'started_at': started_at,
+            'finished_at': _now_iso(),
+            'duration_seconds': round(duration, 3),
+            'dry_run': dry_run,
+        }
+        self.save()
+
+    def save(self):
+        self.data['generated_at'] = _now_iso()
+        tmp_path = self.path.with_suffix('.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self.data, file, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Impossible d'écrire l'instantané de statistiques {self.path}: {e}")
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+def load_library_dump(dump_path: Path) -> Dict[str, Dict]:
+    """Lit un export NDJSON compressé et retourne {nom: {'id': ..., 'items': [...]}}"""
+    libraries: Dict[str, Dict] = {}
+    current: Optional[Dict] = None
+    with gzip.open(dump_path, 'rt', encoding='utf-8') as file:
+        header = json.loads(file.readline() or '{}')
+        if not isinstance(header, dict) or header.get('kind') != 'header' or header.get('version') != LIBRARY_DUMP_VERSION:
+            raise ValueError(f"Format d'export non reconnu: {dump_path}")
+        for line_number, line in enumerate(file, start=2):
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f"Ligne {line_number} invalide dans {dump_path}: objet JSON attendu")
+            if record.get('kind') == 'library':
+                if not isinstance(record.get('name'), str) or not isinstance(record.get('id'), str):
+                    raise ValueError(f"Ligne {line_number} invalide dans {dump_path}: bibliothèque sans 'name' ou 'id'")
+                current = {'id': record['id'], 'items': []}
+                libraries[record['name']] = current
+            elif current is None:
+                raise ValueError(f"Ligne {line_number} invalide dans {dump_path}: élément hors d'une bibliothèque")
+            elif 'Id' not in record:
+                raise ValueError(f"Ligne {line_number} invalide dans {dump_path}: élément sans 'Id'")
+            else:
+                current['items'].append(record)
+    return libraries
+
 class JellyfinKometa:
     def __init__(self, config_path_str: str):
         self.config_path = Path(config_path_str)
         self.config: Dict = {}
+        start = time.perf_counter()
         self._load_config_data()
+        _startup_timings['config'] = time.perf_counter() - start
 
         jellyfin_url_env = os.getenv('JELLYFIN_URL')
         jellyfin_api_key_env = os.getenv('JELLYFIN_API_KEY')
@@ -110,50 +347,135 @@ class JellyfinKometa:
         final_jellyfin_api_key = jellyfin_api_key_env if jellyfin_api_key_env else jellyfin_api_key_config
 
         if not final_jellyfin_url or not final_jellyfin_api_key:
-            logger.error("URL ou clé API Jellyfin manquante. Vérifiez la configuration YAML ou les variables d'environnement JELLYFIN_URL/JELLYFIN_API_KEY.")
+            # Signalé au premier besoin du serveur: l'évaluation hors-ligne n'en a pas besoin
             self.jellyfin: Optional[JellyfinAPI] = None
         else:
             logger.info(f"Utilisation de l'URL Jellyfin: {final_jellyfin_url}")
-            self.jellyfin = JellyfinAPI(final_jellyfin_url, final_jellyfin_api_key)
-        
-        self.user_id: Optional[str] = None
-        self.libraries_map: Dict[str, str] = {}
-        
-        if self.jellyfin:
-            self._initialize_jellyfin_session_data()
-        else:
-            logger.warning("Initialisation de JellyfinAPI échouée, impossible de charger les données de session.")
+            fetch_workers = self.config.get('settings', {}).get('fetch_workers', DEFAULT_FETCH_WORKERS)
+            try:
+                fetch_workers = int(fetch_workers)
+            except (TypeError, ValueError):
+                logger.warning(f"Valeur invalide pour settings.fetch_workers ({fetch_workers!r}), utilisation de {DEFAULT_FETCH_WORKERS}.")
+                fetch_workers = DEFAULT_FETCH_WORKERS
+            self.jellyfin = JellyfinAPI(final_jellyfin_url, final_jellyfin_api_key, max_workers=fetch_workers)
+
+        # Les données de session (utilisateur, bibliothèques) sont chargées au premier accès
+        self._user_id: Optional[str] = None
+        self._libraries_map: Dict[str, str] = {}
+        self._session_loaded = False
+
+    @property
+    def user_id(self) -> Optional[str]:
+        self._ensure_session_data()
+        return self._user_id
+
+    @property
+    def libraries_map(self) -> Dict[str, str]:
+        self._ensure_session_data()
+        return self._libraries_map
+
+    @property
+    def config_cache_path(self) -> Path:
+        return self.config_path.with_name(f".{self.config_path.name}.cache.json")
 
     def _load_config_data(self):
         try:
             if self.config_path.exists():
-                with open(self.config_path, 'r', encoding='utf-8') as file:
-                    self.config = yaml.safe_load(file)
-                    if self.config is None:
-                        self.config = {}
-                    logger.info(f"Configuration chargée depuis {self.config_path}")
+                self.config = self._load_config_from_cache_or_yaml()
+                logger.info(f"Configuration chargée depuis {self.config_path}")
             else:
                 logger.warning(f"Fichier de configuration non trouvé à {self.config_path}. Utilisation d'une configuration vide.")
                 self.config = {}
-        except yaml.YAMLError as e:
-            logger.error(f"Erreur lors du parsing du fichier YAML de configuration {self.config_path}: {e}")
-            self.config = {}
         except Exception as e:
-            logger.error(f"Erreur inattendue lors du chargement de la configuration {self.config_path}: {e}")
+            yaml = sys.modules.get('yaml')
+            if yaml is not None and isinstance(e, yaml.YAMLError):
+                logger.error(f"Erreur lors du parsing du fichier YAML de configuration {self.config_path}: {e}")
+            else:
+                logger.error(f"Erreur inattendue lors du chargement de la configuration {self.config_path}: {e}")
             self.config = {}
 
+    def _load_config_from_cache_or_yaml(self) -> Dict:
+        """Charge la configuration depuis le cache JSON si le YAML n'a pas changé (mtime puis hash)"""
+        stat = self.config_path.stat()
+        cache = self._read_config_cache()
+        if cache and cache.get('mtime_ns') == stat.st_mtime_ns and cache.get('size') == stat.st_size:
+            logger.debug(f"Configuration lue depuis le cache {self.config_cache_path}")
+            return cache['config']
+
+        raw = self.config_path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        if cache and cache.get('sha256') == digest:
+            config = cache['config']
+        else:
+            yaml = _lazy_import('yaml')
+            config = yaml.safe_load(raw.decode('utf-8'))
+            if not isinstance(config, dict):
+                if config is not None:
+                    logger.warning(f"La configuration {self.config_path} n'est pas un dictionnaire. Utilisation d'une configuration vide.")
+                config = {}
+        self._write_config_cache(stat, digest, config)
+        return config
+
+    def _read_config_cache(self) -> Optional[Dict]:
+        try:
+            with open(self.config_cache_path, 'r', encoding='utf-8') as file:
+                cache = json.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Cache de configuration illisible ({self.config_cache_path}): {e}")
+            return None
+        if not isinstance(cache, dict) or cache.get('version') != CONFIG_CACHE_VERSION or not isinstance(cache.get('config'), dict):
+            return None
+        return cache
+
+    def _write_config_cache(self, stat: os.stat_result, digest: str, config: Dict):
+        # JSON ne peut pas exécuter de code; une configuration qui ne s'y convertit pas à l'identique
+        # (dates, clés non textuelles...) n'est pas mise en cache et sera relue depuis le YAML
+        try:
+            if json.loads(json.dumps(config)) != config:
+                raise ValueError("conversion JSON non fidèle")
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Configuration non mise en cache ({e}), relecture du YAML à chaque démarrage.")
+            return
+        cache = {
+            'version': CONFIG_CACHE_VERSION,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': digest,
+            'config': config,
+        }
+        tmp_path = self.config_cache_path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(cache, file, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.config_cache_path)
+        except OSError as e:
+            logger.debug(f"Impossible d'écrire le cache de configuration {self.config_cache_path}: {e}")
+
+    def _ensure_session_data(self):
+        if self._session_loaded:
+            return
+        self._session_loaded = True
+        if not self.jellyfin:
+            logger.error("URL ou clé API Jellyfin manquante. Vérifiez la configuration YAML ou les variables d'environnement JELLYFIN_URL/JELLYFIN_API_KEY.")
+            return
+        start = time.perf_counter()
+        self._initialize_jellyfin_session_data()
+        _startup_timings['session'] = time.perf_counter() - start
+
     def _initialize_jellyfin_session_data(self):
         if not self.jellyfin: return
 
         users = self.jellyfin.get_users()
         if users and len(users) > 0:
-            self.user_id = users[0]['Id']
-            logger.info(f"ID utilisateur récupéré: {self.user_id}")
+            self._user_id = users[0]['Id']
+            logger.info(f"ID utilisateur récupéré: {self._user_id}")
             
-            jellyfin_libs = self.jellyfin.get_libraries(self.user_id)
+            jellyfin_libs = self.jellyfin.get_libraries(self._user_id)
             if jellyfin_libs:
                 for lib in jellyfin_libs:
-                    self.libraries_map[lib['Name']] = lib['Id']
+                    self._libraries_map[lib['Name']] = lib['Id']
                 logger.info(f"Bibliothèques Jellyfin chargées: {list(self.libraries_map.keys())}")
             else:
                 logger.warning("Aucune bibliothèque Jellyfin trouvée pour cet utilisateur.")
@@ -196,7 +518,7 @@ class JellyfinKometa:
 
     def run(self):
         logger.info("=== Jellyfin Kometa - Démarrage du traitement ===")
-        if not self.jellyfin or not self.user_id:
+        if not self.user_id or not self.jellyfin:
             logger.error("Jellyfin n'est pas correctement initialisé ou l'ID utilisateur est manquant. Arrêt.")
             return
 
@@ -209,6 +531,10 @@ class JellyfinKometa:
             logger.info("Aucune bibliothèque configurée dans le fichier YAML. Rien à faire.")
             return
 
+        run_started_at = _now_iso()
+        run_start = time.perf_counter()
+        stats = LibraryStatsSnapshot(DEFAULT_STATS_FILE)
+
         for lib_name_config, lib_config_data in configured_libraries.items():
             if lib_name_config not in self.libraries_map:
                 logger.warning(f"Bibliothèque '{lib_name_config}' configurée dans YAML mais non trouvée dans Jellyfin. Ignorée.")
@@ -216,15 +542,21 @@ class JellyfinKometa:
             
             jellyfin_lib_id = self.libraries_map[lib_name_config]
             logger.info(f"Traitement de la bibliothèque Jellyfin: '{lib_name_config}' (ID: {jellyfin_lib_id})")
+            lib_start = time.perf_counter()
 
             all_items_in_lib = self.jellyfin.get_items(jellyfin_lib_id)
+            if all_items_in_lib is None:
+                logger.error(f"Récupération incomplète de la bibliothèque '{lib_name_config}'. Ignorée pour cette exécution.")
+                continue
             if not all_items_in_lib:
                 logger.info(f"Aucun élément trouvé dans la bibliothèque '{lib_name_config}'.")
+                stats.update_library(lib_name_config, jellyfin_lib_id, [], {}, time.perf_counter() - lib_start)
                 continue
             logger.info(f"{len(all_items_in_lib)} éléments récupérés depuis '{lib_name_config}'.")
 
             existing_collections_in_lib = self.jellyfin.get_collections(jellyfin_lib_id)
             existing_collections_map = {col['Name']: col['Id'] for col in existing_collections_in_lib}
+            collection_stats = {col['Name']: {'id': col['Id'], 'size': col.get('ChildCount', 0)} for col in existing_collections_in_lib}
             logger.info(f"{len(existing_collections_map)} collections existantes trouvées dans '{lib_name_config}'.")
 
             for col_name_config, col_config_data in lib_config_data.get('collections', {}).items():
@@ -249,6 +581,9 @@ class JellyfinKometa:
                     if not dry_run:
                         if self.jellyfin.add_to_collection(collection_id, filtered_item_ids):
                             logger.info(f"      Éléments ajoutés/mis à jour avec succès dans '{col_name_config}'.")
+                            collection_size = self.jellyfin.get_collection_size(collection_id)
+                            if collection_size is not None:
+                                collection_stats[col_name_config]['size'] = collection_size
                         else:
                             logger.error(f"      Échec de l'ajout/mise à jour des éléments dans '{col_name_config}'.")
                     else:
@@ -259,6 +594,7 @@ class JellyfinKometa:
                         new_collection_id = self.jellyfin.create_collection(col_name_config, filtered_item_ids, library_id=jellyfin_lib_id)
                         if new_collection_id:
                             logger.info(f"      Collection '{col_name_config}' créée avec succès (ID: {new_collection_id}).")
+                            collection_stats[col_name_config] = {'id': new_collection_id, 'size': len(filtered_item_ids)}
                         else:
                             logger.error(f"      Échec de la création de la collection '{col_name_config}'.")
                     else:
@@ -267,10 +603,98 @@ class JellyfinKometa:
                 # Gestion du poster (si configuré et si la collection existe/a été créée)
                 # TODO: Ajouter la logique de mise à jour du poster ici
 
+            stats.update_library(lib_name_config, jellyfin_lib_id, all_items_in_lib, collection_stats, time.perf_counter() - lib_start)
+
+        stats.finish_run(run_started_at, time.perf_counter() - run_start, dry_run)
+        logger.info(f"Instantané des statistiques écrit dans {stats.path}")
         logger.info("=== Traitement Jellyfin Kometa terminé ===")
 
+    def export_dump(self, dump_path: Path) -> bool:
+        """Exporte toutes les bibliothèques Jellyfin dans un fichier NDJSON compressé (gzip)"""
+        if not self.user_id or not self.jellyfin:
+            logger.error("Jellyfin n'est pas correctement initialisé ou l'ID utilisateur est manquant. Export impossible.")
+            return False
+
+        tmp_path = dump_path.with_suffix('.tmp')
+        try:
+            dump_path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as file:
+                header = {'kind': 'header', 'version': LIBRARY_DUMP_VERSION, 'exported_at': _now_iso(), 'server_url': self.jellyfin.server_url}
+                file.write(json.dumps(header, ensure_ascii=False) + '\n')
+                for lib_name, lib_id in self.libraries_map.items():
+                    items = self.jellyfin.get_items(lib_id)
+                    if items is None:
+                        logger.error(f"Récupération incomplète de la bibliothèque '{lib_name}'. Export annulé.")
+                        return False
+                    file.write(json.dumps({'kind': 'library', 'name': lib_name, 'id': lib_id, 'count': len(items)}, ensure_ascii=False) + '\n')
+                    for item in items:
+                        compact = {key: item[key] for key in DUMP_ITEM_KEYS if key in item}
+                        file.write(json.dumps(compact, ensure_ascii=False, separators=(',', ':')) + '\n')
+                    logger.info(f"{len(items)} éléments exportés depuis '{lib_name}'.")
+            os.replace(tmp_path, dump_path)
+        except OSError as e:
+            logger.error(f"Erreur lors de l'écriture de l'export {dump_path}: {e}")
+            return False
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        logger.info(f"Export des bibliothèques écrit dans {dump_path}")
+        return True
+
+    def evaluate(self, dump_path: Path) -> Dict:
+        """Évalue la configuration contre un export local, sans aucun appel réseau"""
+        logger.info(f"=== Jellyfin Kometa - Évaluation hors-ligne depuis {dump_path} ===")
+        start = time.perf_counter()
+        dump = load_library_dump(dump_path)
+        report: Dict = {'load_seconds': round(time.perf_counter() - start, 4), 'libraries': {}}
+
+        for lib_name_config, lib_config_data in self.config.get('libraries', {}).items():
+            if lib_name_config not in dump:
+                logger.warning(f"Bibliothèque '{lib_name_config}' configurée dans YAML mais absente de l'export. Ignorée.")
+                continue
+
+            items = dump[lib_name_config]['items']
+            matches: Dict[str, set] = {}
+            lib_report: Dict = {'items': len(items), 'collections': {}, 'overlaps': {}}
+            for col_name_config, col_config_data in lib_config_data.get('collections', {}).items():
+                filters = col_config_data.get('filters', {})
+                if not filters:
+                    continue
+                col_start = time.perf_counter()
+                matches[col_name_config] = {item['Id'] for item in self._filter_items(items, filters)}
+                lib_report['collections'][col_name_config] = {
+                    'matches': len(matches[col_name_config]),
+                    'seconds': round(time.perf_counter() - col_start, 4),
+                }
+                logger.info(f"  '{lib_name_config}' / '{col_name_config}': {len(matches[col_name_config])} éléments "
+                            f"({lib_report['collections'][col_name_config]['seconds'] * 1000:.1f} ms)")
+
+            for (name_a, ids_a), (name_b, ids_b) in combinations(matches.items(), 2):
+                shared = len(ids_a & ids_b)
+                if shared:
+                    lib_report['overlaps'][f"{name_a} & {name_b}"] = shared
+                    logger.info(f"  Chevauchement '{name_a}' / '{name_b}': {shared} éléments communs")
+            report['libraries'][lib_name_config] = lib_report
+
+        report['total_seconds'] = round(time.perf_counter() - start, 4)
+        logger.info(f"=== Évaluation terminée en {report['total_seconds'] * 1000:.1f} ms ===")
+        return report
+
+def _log_startup_profile():
+    logger.info("=== Profil de démarrage ===")
+    for label, duration in _startup_timings.items():
+        logger.info(f"  {label}: {duration * 1000:.1f} ms")
+
 if __name__ == "__main__":
-    config_file_arg = sys.argv[1] if len(sys.argv) > 1 else "config/jellyfin_config.yaml"
+    parser = argparse.ArgumentParser(description="Jellyfin Kometa - gestion automatique des collections")
+    parser.add_argument('config', nargs='?', default="config/jellyfin_config.yaml", help="Chemin du fichier de configuration YAML")
+    parser.add_argument('--startup-profile', action='store_true', help="Affiche les durées d'import et d'initialisation")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--export', metavar='DUMP', help="Exporte les bibliothèques dans un fichier NDJSON compressé (.ndjson.gz)")
+    mode.add_argument('--evaluate', metavar='DUMP', help="Évalue la configuration contre un export local, sans réseau")
+    args = parser.parse_args()
+    _startup_timings['modules'] = time.perf_counter() - _STARTUP_T0
+    config_file_arg = args.config
     
     if not Path(config_file_arg).exists():
         script_dir = Path(__file__).parent
@@ -285,4 +709,19 @@ if __name__ == "__main__":
 
     logger.info(f"Lancement de JellyfinKometa avec le fichier de configuration: {config_file_arg}")
     kometa_manager = JellyfinKometa(config_file_arg)
-    kometa_manager.run()
+    if args.startup_profile:
+        # Le premier travail utile est la découverte de session, déclenchée par run() (inutile hors-ligne)
+        if not args.evaluate:
+            kometa_manager._ensure_session_data()
+        _startup_timings['total'] = time.perf_counter() - _STARTUP_T0
+        _log_startup_profile()
+    if args.export:
+        sys.exit(0 if kometa_manager.export_dump(Path(args.export)) else 1)
+    elif args.evaluate:
+        try:
+            kometa_manager.evaluate(Path(args.evaluate))
+        except (OSError, EOFError, ValueError) as e:
+            logger.error(f"Impossible de lire l'export '{args.evaluate}': {e}. Arrêt.")
+            sys.exit(1)
+    else:
+        kometa_manager.run()